@@ -4,8 +4,16 @@ use fluent_bundle::concurrent::FluentBundle;
 use fluent_bundle::FluentResource;
 use pyo3::exceptions::{PyFileNotFoundError, PyTypeError, PyValueError};
 use pyo3::prelude::*;
-use pyo3::types::{PyDate, PyDict, PyInt, PyList, PyString};
+use pyo3::types::{PyDate, PyDict, PyInt, PyString};
+use rustc_hash::FxHashMap;
 use std::fs;
+use std::io;
+use std::num::NonZeroUsize;
+use std::panic;
+use std::path::{Path, PathBuf};
+use std::sync::{Arc, Mutex, OnceLock, PoisonError};
+use std::thread;
+use std::time::SystemTime;
 use unic_langid::LanguageIdentifier;
 
 use pyo3::create_exception;
@@ -19,52 +27,329 @@ fn rustfluent(m: &Bound<'_, PyModule>) -> PyResult<()> {
     Ok(())
 }
 
-#[pyclass]
+/// A parsed FTL file, along with the metadata of the file it was parsed from.
+struct CachedResource {
+    modified: SystemTime,
+    len: u64,
+    resource: Arc<FluentResource>,
+    has_errors: bool,
+}
+
+/// The number of parsed FTL files kept in the resource cache. Once reached, the cache
+/// is emptied, so that processes loading many different files can't grow it without bound.
+const MAX_CACHED_RESOURCES: usize = 256;
+
+/// Parsed FTL files, keyed by their canonical path.
+///
+/// Shared by every `Bundle` in the process, so that constructing several bundles
+/// from the same files only parses each file once.
+fn resource_cache() -> &'static Mutex<FxHashMap<PathBuf, CachedResource>> {
+    static CACHE: OnceLock<Mutex<FxHashMap<PathBuf, CachedResource>>> = OnceLock::new();
+    CACHE.get_or_init(Default::default)
+}
+
+/// A parsed FTL file, along with whether it contained any errors.
+struct LoadedResource {
+    resource: Arc<FluentResource>,
+    has_errors: bool,
+}
+
+/// An FTL file that needs parsing, along with the metadata to cache it under.
+struct StaleResource {
+    path: PathBuf,
+    modified: SystemTime,
+    len: u64,
+}
+
+/// The result of looking up an FTL file in the resource cache.
+enum Lookup {
+    Cached(LoadedResource),
+    Stale(StaleResource),
+}
+
+/// Look up an FTL file in the resource cache.
+///
+/// A previously parsed resource is reused as long as the file's modification time
+/// and size are unchanged.
+fn lookup_resource(path: &Path) -> io::Result<Lookup> {
+    let path = fs::canonicalize(path)?;
+    let metadata = fs::metadata(&path)?;
+    let modified = metadata.modified()?;
+    let len = metadata.len();
+
+    let cache = resource_cache()
+        .lock()
+        .unwrap_or_else(PoisonError::into_inner);
+    if let Some(cached) = cache.get(&path) {
+        if cached.modified == modified && cached.len == len {
+            return Ok(Lookup::Cached(LoadedResource {
+                resource: Arc::clone(&cached.resource),
+                has_errors: cached.has_errors,
+            }));
+        }
+    }
+    Ok(Lookup::Stale(StaleResource {
+        path,
+        modified,
+        len,
+    }))
+}
+
+/// Read and parse an FTL file, adding it to the resource cache.
+fn parse_resource(stale: &StaleResource) -> io::Result<LoadedResource> {
+    let contents = fs::read_to_string(&stale.path)?;
+    let (resource, has_errors) = match FluentResource::try_new(contents) {
+        Ok(resource) => (Arc::new(resource), false),
+        // The first element of the error is the parsed resource, minus any
+        // invalid messages.
+        Err(error) => (Arc::new(error.0), true),
+    };
+
+    let mut cache = resource_cache()
+        .lock()
+        .unwrap_or_else(PoisonError::into_inner);
+    if cache.len() >= MAX_CACHED_RESOURCES && !cache.contains_key(&stale.path) {
+        cache.clear();
+    }
+    cache.insert(
+        stale.path.clone(),
+        CachedResource {
+            modified: stale.modified,
+            len: stale.len,
+            resource: Arc::clone(&resource),
+            has_errors,
+        },
+    );
+    Ok(LoadedResource {
+        resource,
+        has_errors,
+    })
+}
+
+/// The total size in bytes of the stale FTL files below which they are parsed on the
+/// calling thread, since starting threads would cost more than parsing them.
+const MIN_PARALLEL_PARSE_BYTES: u64 = 64 * 1024;
+
+/// Parse a batch of stale FTL files, keeping each result with its index.
+fn parse_batch(batch: &[(usize, StaleResource)]) -> Vec<(usize, io::Result<LoadedResource>)> {
+    batch
+        .iter()
+        .map(|(index, stale)| (*index, parse_resource(stale)))
+        .collect()
+}
+
+/// Load several FTL files, returning their results in the same order as the paths.
+///
+/// When there is enough to parse, the stale files are split into batches that are
+/// parsed in parallel, with at most one thread per available CPU.
+fn load_resources(paths: &[PathBuf]) -> Vec<io::Result<LoadedResource>> {
+    let mut loaded = Vec::with_capacity(paths.len());
+    let mut stale = Vec::new();
+    for (index, path) in paths.iter().enumerate() {
+        match lookup_resource(path) {
+            Ok(Lookup::Cached(resource)) => loaded.push(Some(Ok(resource))),
+            Ok(Lookup::Stale(resource)) => {
+                stale.push((index, resource));
+                loaded.push(None);
+            }
+            Err(error) => loaded.push(Some(Err(error))),
+        }
+    }
+
+    let workers = thread::available_parallelism()
+        .map_or(1, NonZeroUsize::get)
+        .min(stale.len());
+    let stale_bytes: u64 = stale.iter().map(|(_, resource)| resource.len).sum();
+
+    if workers < 2 || stale_bytes < MIN_PARALLEL_PARSE_BYTES {
+        for (index, result) in parse_batch(&stale) {
+            loaded[index] = Some(result);
+        }
+    } else {
+        let batch_size = stale.len().div_ceil(workers);
+        thread::scope(|scope| {
+            // Start parsing every batch before waiting on any of them.
+            let pending: Vec<_> = stale
+                .chunks(batch_size)
+                .map(|batch| {
+                    thread::Builder::new()
+                        .spawn_scoped(scope, move || parse_batch(batch))
+                        .map_err(|_| batch)
+                })
+                .collect();
+            for batch in pending {
+                let parsed = match batch {
+                    Ok(handle) => handle
+                        .join()
+                        .unwrap_or_else(|payload| panic::resume_unwind(payload)),
+                    // The thread couldn't be started, so parse the batch on this one.
+                    Err(batch) => parse_batch(batch),
+                };
+                for (index, result) in parsed {
+                    loaded[index] = Some(result);
+                }
+            }
+        });
+    }
+
+    loaded
+        .into_iter()
+        .map(|result| result.expect("every FTL file has been loaded"))
+        .collect()
+}
+
+/// Parse a Unicode language identifier, returning `None` if it is invalid.
+fn parse_language(language: &str) -> Option<LanguageIdentifier> {
+    // Language identifiers only ever contain ASCII letters, digits and separators,
+    // so anything else can be rejected without running the parser.
+    if !language
+        .bytes()
+        .all(|byte| byte.is_ascii_alphanumeric() || byte == b'-' || byte == b'_')
+    {
+        return None;
+    }
+    language.parse().ok()
+}
+
+/// A variable value, converted from Python.
+#[derive(PartialEq, Eq, Hash)]
+enum Variable {
+    String(String),
+    Integer(i32),
+}
+
+/// The arguments of a `get_translation` call, identifying a memoized translation.
+#[derive(PartialEq, Eq, Hash)]
+struct TranslationKey {
+    identifier: String,
+    /// Shared, so that `get_translations` can reuse one conversion for every message.
+    variables: Arc<[(String, Variable)]>,
+    use_isolating: bool,
+}
+
+/// The number of translations memoized by each bundle. Once reached, the memoized
+/// translations are discarded, so that varying variables can't grow them without bound.
+const MAX_MEMOIZED_TRANSLATIONS: usize = 1024;
+
+/// The length in bytes of the longest translation that will be interned.
+const MAX_INTERNED_LENGTH: usize = 32;
+
+#[pyclass(module = "rustfluent")]
 struct Bundle {
-    bundle: FluentBundle<FluentResource>,
+    bundle: FluentBundle<Arc<FluentResource>>,
+    translations: FxHashMap<TranslationKey, Py<PyString>>,
 }
 
 #[pymethods]
 impl Bundle {
     #[new]
     #[pyo3(signature = (language, ftl_filenames, strict=false))]
-    fn new(language: &str, ftl_filenames: &'_ Bound<'_, PyList>, strict: bool) -> PyResult<Self> {
-        let langid: LanguageIdentifier = language.parse().expect("Parsing failed");
+    fn new(
+        py: Python<'_>,
+        language: &str,
+        ftl_filenames: Vec<PathBuf>,
+        strict: bool,
+    ) -> PyResult<Self> {
+        let langid = parse_language(language)
+            .ok_or_else(|| PyValueError::new_err(format!("Invalid language: '{language}'")))?;
         let mut bundle = FluentBundle::new_concurrent(vec![langid]);
 
-        for file_path in ftl_filenames.iter() {
-            let path_string = file_path.to_string();
-            let contents = fs::read_to_string(path_string)
-                .map_err(|_| PyFileNotFoundError::new_err(file_path.to_string()))?;
-
-            let resource = match FluentResource::try_new(contents) {
-                Ok(resource) => resource,
-                Err(_) if strict => {
-                    return Err(ParserError::new_err(format!(
-                        "Error when parsing {}.",
-                        file_path
-                    )))
-                }
-                Err(error) => {
-                    // The first element of the error is the parsed resource, minus any
-                    // invalid messages.
-                    error.0
-                }
-            };
-            bundle.add_resource_overriding(resource);
+        // The filenames are extracted via `os.fspath`, so both strings and
+        // path-like objects are accepted without an intermediate `str()` call.
+        // Reading and parsing the files doesn't touch any Python objects,
+        // so other Python threads are free to run in the meantime.
+        let resources = py.allow_threads(|| load_resources(&ftl_filenames));
+
+        // Add the resources in order, so that entries in later files overwrite
+        // earlier ones.
+        for (file_path, loaded) in ftl_filenames.iter().zip(resources) {
+            let loaded = loaded
+                .map_err(|_| PyFileNotFoundError::new_err(file_path.display().to_string()))?;
+
+            if loaded.has_errors && strict {
+                return Err(ParserError::new_err(format!(
+                    "Error when parsing {}.",
+                    file_path.display()
+                )));
+            }
+            bundle.add_resource_overriding(loaded.resource);
         }
 
-        Ok(Self { bundle })
+        Ok(Self {
+            bundle,
+            translations: FxHashMap::default(),
+        })
+    }
+
+    /// Forget all parsed FTL files, so that they are read from disk again
+    /// the next time a `Bundle` uses them.
+    #[staticmethod]
+    fn cache_clear() {
+        resource_cache()
+            .lock()
+            .unwrap_or_else(PoisonError::into_inner)
+            .clear();
     }
 
     #[pyo3(signature = (identifier, variables=None, use_isolating=true))]
     pub fn get_translation(
         &mut self,
+        py: Python<'_>,
         identifier: &str,
         variables: Option<&Bound<'_, PyDict>>,
         use_isolating: bool,
-    ) -> PyResult<String> {
-        self.bundle.set_use_isolating(use_isolating);
+    ) -> PyResult<Py<PyString>> {
+        let key = TranslationKey {
+            identifier: identifier.to_string(),
+            variables: extract_variables(variables)?.into(),
+            use_isolating,
+        };
+        self.translate(py, key)
+    }
+
+    #[pyo3(signature = (identifiers, variables=None, use_isolating=true))]
+    pub fn get_translations<'py>(
+        &mut self,
+        py: Python<'py>,
+        identifiers: Vec<String>,
+        variables: Option<&Bound<'py, PyDict>>,
+        use_isolating: bool,
+    ) -> PyResult<Bound<'py, PyDict>> {
+        // The variables are shared by every message, so only convert them once.
+        let variables: Arc<[_]> = extract_variables(variables)?.into();
+
+        let translations = PyDict::new(py);
+        for identifier in identifiers {
+            let key = TranslationKey {
+                identifier: identifier.clone(),
+                variables: Arc::clone(&variables),
+                use_isolating,
+            };
+            translations.set_item(identifier, self.translate(py, key)?)?;
+        }
+        Ok(translations)
+    }
+}
+
+impl Bundle {
+    /// Return the translation for a key, formatting and memoizing it if necessary.
+    fn translate(&mut self, py: Python<'_>, key: TranslationKey) -> PyResult<Py<PyString>> {
+        if let Some(translation) = self.translations.get(&key) {
+            return Ok(translation.clone_ref(py));
+        }
+
+        let translation = self.format_message(py, &key)?;
+        if self.translations.len() >= MAX_MEMOIZED_TRANSLATIONS {
+            self.translations.clear();
+        }
+        self.translations.insert(key, translation.clone_ref(py));
+        Ok(translation)
+    }
+
+    /// Format a message with the Fluent resolver, bypassing the memoized translations.
+    fn format_message(&mut self, py: Python<'_>, key: &TranslationKey) -> PyResult<Py<PyString>> {
+        let identifier = key.identifier.as_str();
+        self.bundle.set_use_isolating(key.use_isolating);
 
         let msg = self
             .bundle
@@ -76,62 +361,102 @@ impl Bundle {
             PyValueError::new_err(format!("{identifier} - Message has no value.",))
         })?;
 
-        let mut args = FluentArgs::new();
-
-        if let Some(variables) = variables {
-            for variable in variables {
-                // Make sure the variable key is a Python string,
-                // raising a TypeError if not.
-                let python_key = variable.0;
-                if !python_key.is_instance_of::<PyString>() {
-                    return Err(PyTypeError::new_err(format!(
-                        "Variable key not a str, got {}.",
-                        python_key
-                    )));
-                }
-                let key = python_key.to_string();
-                // Set the variable value as a string or integer,
-                // raising a TypeError if not.
-                let python_value = variable.1;
-                if python_value.is_instance_of::<PyString>() {
-                    args.set(key, python_value.to_string());
-                } else if python_value.is_instance_of::<PyInt>() {
-                    match python_value.extract::<i32>() {
-                        Ok(int_value) => {
-                            args.set(key, int_value);
-                        }
-                        _ => {
-                            // The Python integer overflowed i32.
-                            // Fall back to displaying the variable key as its value.
-                            let fallback_value = key.clone();
-                            args.set(key, fallback_value);
-                        }
-                    }
-                } else if python_value.is_instance_of::<PyDate>() {
-                    // Display the Python date as YYYY-MM-DD.
-                    match python_value.extract::<NaiveDate>() {
-                        Ok(chrono_date) => {
-                            args.set(key, chrono_date.format("%Y-%m-%d").to_string());
-                        }
-                        _ => {
-                            // Could not convert.
-                            // Fall back to displaying the variable key as its value.
-                            let fallback_value = key.clone();
-                            args.set(key, fallback_value);
-                        }
-                    }
-                } else {
-                    // The variable value was of an unsupported type.
-                    // Fall back to displaying the variable key as its value.
-                    let fallback_value = key.clone();
-                    args.set(key, fallback_value);
-                }
+        // The variables are already sorted by name, so each one is appended to the
+        // end of the arguments without reallocating.
+        let mut args = FluentArgs::with_capacity(key.variables.len());
+        for (name, value) in key.variables.iter() {
+            match value {
+                Variable::String(string) => args.set(name.as_str(), string.as_str()),
+                Variable::Integer(integer) => args.set(name.as_str(), *integer),
             }
         }
 
         let value = self
             .bundle
             .format_pattern(pattern, Some(&args), &mut errors);
-        Ok(value.to_string())
+
+        // A message formatted without variables is the same every time, so short
+        // ones are interned to share them with any equal strings in the interpreter.
+        let translation = if key.variables.is_empty() && value.len() <= MAX_INTERNED_LENGTH {
+            PyString::intern(py, &value)
+        } else {
+            PyString::new(py, &value)
+        };
+        Ok(translation.unbind())
+    }
+}
+
+/// Convert the variables passed from Python to their Fluent values, sorted by name.
+fn extract_variables(variables: Option<&Bound<'_, PyDict>>) -> PyResult<Vec<(String, Variable)>> {
+    let Some(variables) = variables else {
+        return Ok(Vec::new());
+    };
+
+    let mut extracted = Vec::with_capacity(variables.len());
+    for variable in variables {
+        // Make sure the variable key is a Python string,
+        // raising a TypeError if not.
+        let python_key = variable.0;
+        let Ok(key) = python_key.downcast::<PyString>() else {
+            return Err(variable_key_error(&python_key));
+        };
+        let key = string_from_python(key);
+        // Set the variable value as a string or integer,
+        // raising a TypeError if not.
+        let python_value = variable.1;
+        let value = if let Ok(string_value) = python_value.downcast::<PyString>() {
+            Variable::String(string_from_python(string_value))
+        } else if python_value.is_instance_of::<PyInt>() {
+            match python_value.extract::<i32>() {
+                Ok(int_value) => Variable::Integer(int_value),
+                _ => {
+                    // The Python integer overflowed i32.
+                    // Fall back to displaying the variable key as its value.
+                    Variable::String(key.clone())
+                }
+            }
+        } else if python_value.is_instance_of::<PyDate>() {
+            // Display the Python date as YYYY-MM-DD.
+            match python_value.extract::<NaiveDate>() {
+                Ok(chrono_date) => Variable::String(chrono_date.format("%Y-%m-%d").to_string()),
+                _ => {
+                    // Could not convert.
+                    // Fall back to displaying the variable key as its value.
+                    Variable::String(key.clone())
+                }
+            }
+        } else {
+            // The variable value was of an unsupported type.
+            // Fall back to displaying the variable key as its value.
+            Variable::String(key.clone())
+        };
+        extracted.push((key, value));
     }
+
+    // Sort by name, so that the same variables passed in a different order
+    // share a memoized translation.
+    extracted.sort_unstable_by(|a, b| a.0.cmp(&b.0));
+    Ok(extracted)
+}
+
+/// Convert a Python string to a Rust one.
+///
+/// Exact `str` objects are copied straight from their buffer. Subclasses may
+/// override `__str__`, so they still go through `str()`.
+fn string_from_python(string: &Bound<'_, PyString>) -> String {
+    if string.is_exact_instance_of::<PyString>() {
+        string.to_string_lossy().into_owned()
+    } else {
+        string.to_string()
+    }
+}
+
+/// Build the error raised for a variable key that isn't a string.
+///
+/// Kept out of line, so that formatting the message doesn't weigh on the
+/// conversion loop in `extract_variables`.
+#[cold]
+#[inline(never)]
+fn variable_key_error(key: &Bound<'_, PyAny>) -> PyErr {
+    PyTypeError::new_err(format!("Variable key not a str, got {key}."))
 }
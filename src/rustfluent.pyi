@@ -1,12 +1,27 @@
+import os
+from collections.abc import Sequence
 from datetime import date
 
 Variable = str | int | date
 
 class Bundle:
-    def __init__(self, language: str, ftl_filenames: list[str], strict: bool = False) -> None: ...
+    def __init__(
+        self,
+        language: str,
+        ftl_filenames: Sequence[str | os.PathLike[str]],
+        strict: bool = False,
+    ) -> None: ...
     def get_translation(
         self,
         identifier: str,
         variables: dict[str, Variable] | None = None,
         use_isolating: bool = True,
     ) -> str: ...
+    def get_translations(
+        self,
+        identifiers: list[str],
+        variables: dict[str, Variable] | None = None,
+        use_isolating: bool = True,
+    ) -> dict[str, str]: ...
+    @staticmethod
+    def cache_clear() -> None: ...
@@ -0,0 +1,22 @@
+"""
+Shared bundles for the test suite.
+
+Bundles are built inside session-scoped fixtures rather than at module level, so they are only
+built when a test that uses them runs, and at most once per session. Collecting the tests
+(e.g. `pytest --collect-only`) doesn't read any FTL files.
+"""
+
+import pytest
+
+import rustfluent as fluent
+from tests.paths import EN_FTL, FR_FTL
+
+
+@pytest.fixture(scope="session")
+def en_bundle():
+    return fluent.Bundle("en", [EN_FTL])
+
+
+@pytest.fixture(scope="session")
+def fr_bundle():
+    return fluent.Bundle("fr", [FR_FTL])
@@ -0,0 +1,9 @@
+import pathlib
+
+
+data_dir = pathlib.Path(__file__).parent.resolve() / "data"
+
+EN_FTL = str(data_dir / "en.ftl")
+EN_HELLO_FTL = str(data_dir / "en_hello.ftl")
+ERRORS_FTL = str(data_dir / "errors.ftl")
+FR_FTL = str(data_dir / "fr.ftl")
@@ -1,45 +1,47 @@
 #!/usr/bin/env python
-import pathlib
+import os
 import re
 from datetime import datetime
 
 import pytest
 
 import rustfluent as fluent
+from tests.paths import EN_FTL, EN_HELLO_FTL, ERRORS_FTL, FR_FTL, data_dir
 
 
-data_dir = pathlib.Path(__file__).parent.resolve() / "data"
-
 # Bidirectional markers.
 # See https://unicode.org/reports/tr9/#Directional_Formatting_Characters
 BIDI_OPEN, BIDI_CLOSE = "\u2068", "\u2069"
 
 
 def test_en_basic():
-    bundle = fluent.Bundle("en", [str(data_dir / "en.ftl")])
+    bundle = fluent.Bundle("en", [EN_FTL])
     assert bundle.get_translation("hello-world") == "Hello World"
 
 
 def test_en_basic_with_named_arguments():
     bundle = fluent.Bundle(
         language="en",
-        ftl_filenames=[str(data_dir / "en.ftl")],
+        ftl_filenames=[EN_FTL],
     )
     assert bundle.get_translation("hello-world") == "Hello World"
 
 
-def test_en_with_variables():
-    bundle = fluent.Bundle("en", [str(data_dir / "en.ftl")])
+def test_en_basic_with_path_objects():
+    bundle = fluent.Bundle("en", [data_dir / "en.ftl"])
+    assert bundle.get_translation("hello-world") == "Hello World"
+
+
+def test_en_with_variables(en_bundle):
     assert (
-        bundle.get_translation("hello-user", variables={"user": "Bob"})
+        en_bundle.get_translation("hello-user", variables={"user": "Bob"})
         == f"Hello, {BIDI_OPEN}Bob{BIDI_CLOSE}"
     )
 
 
-def test_en_with_variables_use_isolating_off():
-    bundle = fluent.Bundle("en", [str(data_dir / "en.ftl")])
+def test_en_with_variables_use_isolating_off(en_bundle):
     assert (
-        bundle.get_translation(
+        en_bundle.get_translation(
             "hello-user",
             variables={"user": "Bob"},
             use_isolating=False,
@@ -48,6 +50,17 @@ def test_en_with_variables_use_isolating_off():
     )
 
 
+def test_repeated_translations_with_different_variables(en_bundle):
+    for user in ("Bob", "Alice", "Bob"):
+        assert (
+            en_bundle.get_translation("hello-user", variables={"user": user}, use_isolating=False)
+            == f"Hello, {user}"
+        )
+    assert en_bundle.get_translation("hello-user", variables={"user": "Bob"}) == (
+        f"Hello, {BIDI_OPEN}Bob{BIDI_CLOSE}"
+    )
+
+
 @pytest.mark.parametrize(
     "description, identifier, variables, expected",
     (
@@ -61,14 +74,25 @@ def test_en_with_variables_use_isolating_off():
         ),
     ),
 )
-def test_variables_of_different_types(description, identifier, variables, expected):
-    bundle = fluent.Bundle("en", [str(data_dir / "en.ftl")])
-
-    result = bundle.get_translation(identifier, variables=variables)
+def test_variables_of_different_types(description, identifier, variables, expected, en_bundle):
+    result = en_bundle.get_translation(identifier, variables=variables)
 
     assert result == expected
 
 
+class Shouting(str):
+    def __str__(self):
+        return self.upper()
+
+
+def test_str_subclass_variables_are_rendered_with_str(en_bundle):
+    result = en_bundle.get_translation(
+        "hello-user", variables={"user": Shouting("Bob")}, use_isolating=False
+    )
+
+    assert result == "Hello, BOB"
+
+
 @pytest.mark.parametrize(
     "key",
     (
@@ -77,11 +101,9 @@ def test_variables_of_different_types(description, identifier, variables, expect
         10,
     ),
 )
-def test_invalid_variable_keys_raise_type_error(key):
-    bundle = fluent.Bundle("en", [str(data_dir / "en.ftl")])
-
+def test_invalid_variable_keys_raise_type_error(key, en_bundle):
     with pytest.raises(TypeError, match="Variable key not a str, got"):
-        bundle.get_translation("hello-user", variables={key: "Bob"})
+        en_bundle.get_translation("hello-user", variables={key: "Bob"})
 
 
 @pytest.mark.parametrize(
@@ -92,23 +114,38 @@ def test_invalid_variable_keys_raise_type_error(key):
         1_000_000_000_000,  # Larger than signed long integer.
     ),
 )
-def test_invalid_variable_values_use_key_instead(value):
-    bundle = fluent.Bundle("en", [str(data_dir / "en.ftl")])
-
-    result = bundle.get_translation("hello-user", variables={"user": value})
+def test_invalid_variable_values_use_key_instead(value, en_bundle):
+    result = en_bundle.get_translation("hello-user", variables={"user": value})
 
     assert result == f"Hello, {BIDI_OPEN}user{BIDI_CLOSE}"
 
 
+def test_get_translations(en_bundle):
+    result = en_bundle.get_translations(
+        ["hello-world", "hello-user", "apples"],
+        variables={"user": "Bob", "numberOfApples": 10},
+    )
+
+    assert result == {
+        "hello-world": "Hello World",
+        "hello-user": f"Hello, {BIDI_OPEN}Bob{BIDI_CLOSE}",
+        "apples": f"{BIDI_OPEN}10{BIDI_CLOSE} apples",
+    }
+
+
+def test_get_translations_id_not_found(en_bundle):
+    with pytest.raises(ValueError):
+        en_bundle.get_translations(["hello-world", "missing"])
+
+
 def test_fr_basic():
-    bundle = fluent.Bundle("fr", [str(data_dir / "fr.ftl")])
+    bundle = fluent.Bundle("fr", [FR_FTL])
     assert bundle.get_translation("hello-world") == "Bonjour le monde!"
 
 
-def test_fr_with_args():
-    bundle = fluent.Bundle("fr", [str(data_dir / "fr.ftl")])
+def test_fr_with_args(fr_bundle):
     assert (
-        bundle.get_translation("hello-user", variables={"user": "Bob"})
+        fr_bundle.get_translation("hello-user", variables={"user": "Bob"})
         == f"Bonjour, {BIDI_OPEN}Bob{BIDI_CLOSE}!"
     )
 
@@ -123,10 +160,8 @@ def test_fr_with_args():
         ("1", "Something else"),
     ),
 )
-def test_selector(number, expected):
-    bundle = fluent.Bundle("en", [str(data_dir / "en.ftl")])
-
-    result = bundle.get_translation("with-selector", variables={"number": number})
+def test_selector(number, expected, en_bundle):
+    result = en_bundle.get_translation("with-selector", variables={"number": number})
 
     assert result == expected
 
@@ -134,7 +169,7 @@ def test_selector(number, expected):
 def test_new_overwrites_old():
     bundle = fluent.Bundle(
         "en",
-        [str(data_dir / "fr.ftl"), str(data_dir / "en_hello.ftl")],
+        [FR_FTL, EN_HELLO_FTL],
     )
     assert bundle.get_translation("hello-world") == "Hello World"
     assert (
@@ -143,10 +178,66 @@ def test_new_overwrites_old():
     )
 
 
-def test_id_not_found():
-    bundle = fluent.Bundle("fr", [str(data_dir / "fr.ftl")])
+def test_new_overwrites_old_when_files_are_parsed_on_one_thread(tmp_path):
+    first, second, third = (tmp_path / name for name in ("first.ftl", "second.ftl", "third.ftl"))
+    first.write_text("hello-world = First\nhello-user = First, { $user }\n")
+    second.write_text("hello-world = Second\n")
+    third.write_text("goodbye = Third\n")
+
+    bundle = fluent.Bundle("en", [first, second, third])
+
+    assert bundle.get_translation("hello-world") == "Second"
+    assert (
+        bundle.get_translation("hello-user", variables={"user": "Bob"}, use_isolating=False)
+        == "First, Bob"
+    )
+    assert bundle.get_translation("goodbye") == "Third"
+
+
+# Comments that make each file large enough for a handful of them to exceed the size
+# (64 KiB) below which stale FTL files are parsed on the calling thread.
+FTL_PADDING = "".join(f"# Padding comment {index:04}.\n" for index in range(1000))
+PARALLEL_PARSE_FILE_COUNT = 8
+requires_several_cpus = pytest.mark.skipif(
+    (os.cpu_count() or 1) < 2, reason="FTL files are only parsed in parallel on several CPUs"
+)
+
+
+@requires_several_cpus
+def test_new_overwrites_old_when_files_are_parsed_in_parallel(tmp_path):
+    ftl_files = [tmp_path / f"messages-{index}.ftl" for index in range(PARALLEL_PARSE_FILE_COUNT)]
+    for index, ftl_file in enumerate(ftl_files):
+        ftl_file.write_text(
+            f"{FTL_PADDING}hello-world = File {index}\nmessage-{index} = Only in file {index}\n"
+        )
+
+    bundle = fluent.Bundle("en", ftl_files)
+
+    assert bundle.get_translation("hello-world") == f"File {PARALLEL_PARSE_FILE_COUNT - 1}"
+    for index in range(PARALLEL_PARSE_FILE_COUNT):
+        assert bundle.get_translation(f"message-{index}") == f"Only in file {index}"
+
+
+@requires_several_cpus
+def test_first_parser_error_is_raised_when_files_are_parsed_in_parallel(tmp_path):
+    ftl_files = [tmp_path / f"messages-{index}.ftl" for index in range(PARALLEL_PARSE_FILE_COUNT)]
+    for index, ftl_file in enumerate(ftl_files):
+        invalid_message = "invalid-message\n" if index in (2, 5) else ""
+        ftl_file.write_text(f"{FTL_PADDING}{invalid_message}message-{index} = File {index}\n")
+
+    with pytest.raises(fluent.ParserError, match=re.escape(f"Error when parsing {ftl_files[2]}.")):
+        fluent.Bundle("en", ftl_files, strict=True)
+
+
+def test_id_not_found(fr_bundle):
     with pytest.raises(ValueError):
-        bundle.get_translation("missing", variables={"user": "Bob"})
+        fr_bundle.get_translation("missing", variables={"user": "Bob"})
+
+
+@pytest.mark.parametrize("language", ("$", "en US", "not-a-language"))
+def test_invalid_language(language):
+    with pytest.raises(ValueError, match=re.escape(f"Invalid language: '{language}'")):
+        fluent.Bundle(language, [EN_FTL])
 
 
 def test_file_not_found():
@@ -160,17 +251,46 @@ def test_parses_other_parts_of_file_that_contains_errors_in_non_strict_mode(
 ):
     kwargs = dict(strict=False) if pass_strict_argument_explicitly else {}
 
-    bundle = fluent.Bundle("fr", [str(data_dir / "errors.ftl")], **kwargs)
+    bundle = fluent.Bundle("fr", [ERRORS_FTL], **kwargs)
     translation = bundle.get_translation("valid-message")
 
     assert translation == "I'm valid."
 
 
 def test_raises_parser_error_on_file_that_contains_errors_in_strict_mode():
-    filename = str(data_dir / "errors.ftl")
-    with pytest.raises(fluent.ParserError, match=re.escape(f"Error when parsing {filename}.")):
-        fluent.Bundle("fr", [filename], strict=True)
+    with pytest.raises(fluent.ParserError, match=re.escape(f"Error when parsing {ERRORS_FTL}.")):
+        fluent.Bundle("fr", [ERRORS_FTL], strict=True)
 
 
 def test_parser_error_str():
     assert str(fluent.ParserError) == "<class 'rustfluent.ParserError'>"
+
+
+def test_changed_file_is_parsed_again(tmp_path):
+    ftl_file = tmp_path / "messages.ftl"
+    ftl_file.write_text("hello-world = Hello World\n")
+    assert fluent.Bundle("en", [str(ftl_file)]).get_translation("hello-world") == "Hello World"
+
+    ftl_file.write_text("hello-world = Hello again, World\n")
+
+    assert (
+        fluent.Bundle("en", [str(ftl_file)]).get_translation("hello-world") == "Hello again, World"
+    )
+
+
+def test_unchanged_file_is_cached_until_cache_clear(tmp_path):
+    ftl_file = tmp_path / "messages.ftl"
+    ftl_file.write_text("hello-world = Hello World\n")
+    assert fluent.Bundle("en", [str(ftl_file)]).get_translation("hello-world") == "Hello World"
+
+    # Overwrite the file with content of the same length, and restore its modification
+    # time, so that it looks unchanged.
+    original_mtime_ns = ftl_file.stat().st_mtime_ns
+    ftl_file.write_text("hello-world = Howdy World\n")
+    os.utime(ftl_file, ns=(original_mtime_ns, original_mtime_ns))
+
+    assert fluent.Bundle("en", [str(ftl_file)]).get_translation("hello-world") == "Hello World"
+
+    fluent.Bundle.cache_clear()
+
+    assert fluent.Bundle("en", [str(ftl_file)]).get_translation("hello-world") == "Howdy World"